@@ -1,15 +1,15 @@
-import os
 import requests
 from PIL import Image
 from io import BytesIO
 
+from cover_store import CoverStore
+
 # ---------------- CONFIG ----------------
-CACHE_DIR = "cache/covers"  # where images will be saved
 CARD_WIDTH = 150
 CARD_HEIGHT = 200
 
-# Ensure cache directory exists
-os.makedirs(CACHE_DIR, exist_ok=True)
+# Shared content-addressed store (absolute path, unaffected by os.chdir)
+COVER_STORE = CoverStore()
 
 # ---------------- ANILIST QUERY ----------------
 ANILIST_API = "https://graphql.anilist.co"
@@ -28,20 +28,8 @@ query ($search: String) {
 }
 """
 
-def download_cover(anime_name: str) -> str | None:
-    """
-    Query AniList for anime cover, download and save locally.
-    Returns local file path if successful, None otherwise.
-    """
-    # Clean filename
-    filename = anime_name.replace(" ", "_") + ".jpg"
-    filepath = os.path.join(CACHE_DIR, filename)
-
-    # Skip if already exists
-    if os.path.isfile(filepath):
-        return filepath
-
-    # Query AniList API
+def fetch_cover_url(anime_name: str) -> str | None:
+    """Query AniList for the best available cover URL of an anime."""
     response = requests.post(ANILIST_API, json={"query": QUERY, "variables": {"search": anime_name}})
     if response.status_code != 200:
         print(f"[Downloader] AniList API error for {anime_name}: {response.status_code}")
@@ -58,23 +46,53 @@ def download_cover(anime_name: str) -> str | None:
     if not cover_url:
         print(f"[Downloader] No cover URL found for {anime_name}")
         return None
+    return cover_url
+
+
+def render_cover(img_data: bytes) -> bytes:
+    """Fit an image into a CARD_WIDTH x CARD_HEIGHT black card and return it as JPEG bytes."""
+    img = Image.open(BytesIO(img_data)).convert("RGB")
+
+    # Resize maintaining aspect ratio
+    img.thumbnail((CARD_WIDTH, CARD_HEIGHT))
+    # Create background and paste to center
+    final_img = Image.new("RGB", (CARD_WIDTH, CARD_HEIGHT), (0, 0, 0))
+    x_offset = (CARD_WIDTH - img.width) // 2
+    y_offset = (CARD_HEIGHT - img.height) // 2
+    final_img.paste(img, (x_offset, y_offset))
+
+    out = BytesIO()
+    final_img.save(out, format="JPEG")
+    return out.getvalue()
+
+
+def ensure_cover(anime_name: str, store: CoverStore = COVER_STORE) -> str | None:
+    """
+    Return the blob digest of an anime's cover, downloading it from AniList if needed.
+    Covers already fetched from the same URL (e.g. another season folder) are reused.
+    """
+    # Skip if already exists
+    digest = store.lookup(anime_name)
+    if digest:
+        return digest
+
+    cover_url = fetch_cover_url(anime_name)
+    if not cover_url:
+        return None
+
+    digest = store.lookup_source(cover_url)
+    if digest:
+        store.link(anime_name, digest)
+        store.save()
+        return digest
 
     # Download image
     try:
         img_data = requests.get(cover_url).content
-        img = Image.open(BytesIO(img_data)).convert("RGB")
-
-        # Resize maintaining aspect ratio
-        img.thumbnail((CARD_WIDTH, CARD_HEIGHT))
-        # Create background and paste to center
-        final_img = Image.new("RGB", (CARD_WIDTH, CARD_HEIGHT), (0, 0, 0))
-        x_offset = (CARD_WIDTH - img.width) // 2
-        y_offset = (CARD_HEIGHT - img.height) // 2
-        final_img.paste(img, (x_offset, y_offset))
-
-        final_img.save(filepath)
+        digest = store.put(anime_name, render_cover(img_data), source=cover_url)
+        store.save()
         print(f"[Downloader] Saved cover for {anime_name}")
-        return filepath
+        return digest
     except Exception as e:
         print(f"[Downloader] Failed to download {anime_name}: {e}")
         return None
@@ -83,4 +101,4 @@ if __name__ == "__main__":
     # Example usage: read anime names from a file or list
     anime_list = ["Tearmoon Empire", "Momentary Lily", "Momokuri"]
     for anime in anime_list:
-        download_cover(anime)
+        ensure_cover(anime)
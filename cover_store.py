@@ -0,0 +1,128 @@
+# cover_store.py
+import hashlib
+import json
+import os
+import time
+from typing import Callable
+
+from library import read_json, write_json
+
+# ---------------- CONFIG ----------------
+COVER_ROOT = os.path.join(os.path.expanduser("~"), ".cache", "anima-lite", "covers")
+MAX_CACHE_BYTES = 64 * 1024 * 1024  # blobs are evicted least-recently-used first past this
+
+
+class CoverStore:
+    """
+    A content-addressed cover cache. Blobs are named by the SHA-256 of their
+    bytes, so series sharing the same cover share one file, and arbitrary
+    series names never end up in a file path.
+
+    The index maps series name -> blob digest and cover URL -> blob digest,
+    and tracks blob sizes and last use for LRU garbage collection.
+    """
+
+    def __init__(self, root: str = COVER_ROOT, max_bytes: int = MAX_CACHE_BYTES) -> None:
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(self.root, "index.json")
+
+        try:
+            index = read_json(self.index_file)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # Blobs are still on disk; put() reuses them as covers are fetched again
+            print(f"[WARN] Ignoring unreadable cover index {self.index_file}")
+            index = {}
+        self.series: dict[str, str] = index.get("series", {})
+        self.sources: dict[str, str] = index.get("sources", {})
+        self.blobs: dict[str, dict] = index.get("blobs", {})
+        self._dirty = False
+
+        # Called with the digest of every blob dropped from the store, e.g. to release decoded images
+        self.on_evict: list[Callable[[str], None]] = []
+
+    def blob_path(self, digest: str) -> str:
+        """Return the absolute path of a blob."""
+        return os.path.join(self.root, digest[:2], digest + ".jpg")
+
+    def _touch(self, digest: str) -> str | None:
+        """Mark a blob as used; return its digest, or None if the blob is gone."""
+        if digest not in self.blobs or not os.path.isfile(self.blob_path(digest)):
+            self._forget(digest)
+            return None
+        self.blobs[digest]["last_used"] = time.time()
+        self._dirty = True
+        return digest
+
+    def lookup(self, series_name: str) -> str | None:
+        """Return the blob digest of a series' cover, or None if not cached."""
+        digest = self.series.get(series_name)
+        return self._touch(digest) if digest else None
+
+    def lookup_source(self, url: str) -> str | None:
+        """Return the blob digest already downloaded from a cover URL, if any."""
+        digest = self.sources.get(url)
+        return self._touch(digest) if digest else None
+
+    def link(self, series_name: str, digest: str, source: str | None = None) -> None:
+        """Point a series (and optionally a source URL) at an existing blob."""
+        self.series[series_name] = digest
+        if source:
+            self.sources[source] = digest
+        self._touch(digest)
+
+    def put(self, series_name: str, data: bytes, source: str | None = None) -> str:
+        """Store cover bytes for a series and return their digest. Identical bytes are stored once."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+
+        if not os.path.isfile(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        self.blobs[digest] = {"size": len(data), "last_used": time.time()}
+        self.link(series_name, digest, source)
+        self.collect_garbage(keep=digest)
+        return digest
+
+    def _forget(self, digest: str) -> None:
+        """Drop a blob and every index entry pointing at it."""
+        self.blobs.pop(digest, None)
+        for callback in self.on_evict:
+            callback(digest)
+        for mapping in (self.series, self.sources):
+            for key in [k for k, v in mapping.items() if v == digest]:
+                del mapping[key]
+        self._dirty = True
+
+    def collect_garbage(self, keep: str | None = None) -> None:
+        """Evict least-recently-used blobs until the store fits in max_bytes."""
+        total = sum(info["size"] for info in self.blobs.values())
+        if total <= self.max_bytes:
+            return
+
+        by_age = sorted(self.blobs, key=lambda d: self.blobs[d]["last_used"])
+        for digest in by_age:
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            total -= self.blobs[digest]["size"]
+            try:
+                os.remove(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+            self._forget(digest)
+
+    def save(self) -> None:
+        """Write the index to disk if it changed. write_json swaps in a complete file."""
+        if not self._dirty:
+            return
+        write_json(
+            self.index_file,
+            {"series": self.series, "sources": self.sources, "blobs": self.blobs},
+        )
+        self._dirty = False
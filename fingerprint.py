@@ -0,0 +1,115 @@
+# fingerprint.py
+import hashlib
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from library import AnimeLibrary
+from stat_cache import StatCache, benchmark_cold_warm, cached_map
+
+# ---------------- CONFIG ----------------
+BLOCK_SIZE = 64 * 1024  # bytes hashed from each of head / middle / tail
+CACHE_FILENAME = "fingerprints.json"  # stored next to anime_data.json
+MAX_WORKERS = os.cpu_count() or 4
+CHUNKSIZE = 16  # files handed to a worker process at a time
+
+
+def fingerprint_file(path: str) -> str:
+    """
+    Return a cheap content fingerprint: the file size plus a hash of its
+    head, middle and tail blocks. Reads at most 3 * BLOCK_SIZE bytes.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(size.to_bytes(8, "little"), digest_size=16)
+
+    with open(path, "rb") as f:
+        if size <= 3 * BLOCK_SIZE:
+            digest.update(f.read())
+        else:
+            for offset in (0, (size - BLOCK_SIZE) // 2, size - BLOCK_SIZE):
+                f.seek(offset)
+                digest.update(f.read(BLOCK_SIZE))
+
+    return f"{size}:{digest.hexdigest()}"
+
+
+def _fingerprint_job(path: str) -> tuple[str, str | None]:
+    """Worker entry point; errors are reported as a None fingerprint."""
+    try:
+        return path, fingerprint_file(path)
+    except OSError:
+        return path, None
+
+
+def fingerprint_files(
+    paths: list[str], cache: StatCache, max_workers: int = MAX_WORKERS
+) -> dict[str, str]:
+    """Hash files in a process pool (hashing is CPU bound); maps path -> fingerprint string."""
+    return cached_map(
+        paths, cache, _fingerprint_job, ProcessPoolExecutor, max_workers, CHUNKSIZE
+    )
+
+
+def find_duplicate_groups(
+    paths: list[str], cache: StatCache, max_workers: int = MAX_WORKERS
+) -> list[list[str]]:
+    """
+    Return groups of files with identical fingerprints.
+    Files with a unique size can't have a duplicate, so they are never read.
+    """
+    by_size: dict[int, list[str]] = defaultdict(list)
+    for path in paths:
+        try:
+            by_size[os.path.getsize(path)].append(path)
+        except OSError:
+            continue
+
+    candidates = [p for group in by_size.values() if len(group) > 1 for p in group]
+    fingerprints = fingerprint_files(candidates, cache, max_workers)
+
+    by_fingerprint: dict[str, list[str]] = defaultdict(list)
+    for path, fp in fingerprints.items():
+        by_fingerprint[fp].append(path)
+
+    return sorted(sorted(g) for g in by_fingerprint.values() if len(g) > 1)
+
+
+def find_library_duplicates(
+    library: AnimeLibrary,
+    cache: StatCache | None = None,
+    max_workers: int = MAX_WORKERS,
+) -> list[list[str]]:
+    """
+    Report duplicate episode groups across the whole library.
+    Fingerprints are cached next to the library data so rescans only read new or changed files.
+    """
+    if cache is None:
+        cache = StatCache(os.path.join(library.root_dir, CACHE_FILENAME))
+    paths = library.list_all_episode_paths()
+
+    groups = find_duplicate_groups(paths, cache, max_workers)
+
+    cache.prune(paths)
+    cache.save()
+    return groups
+
+
+if __name__ == "__main__":
+    VIDEOS_DIR = "/home/moondip/Videos"
+    anime_lib = AnimeLibrary(VIDEOS_DIR)
+    anime_lib.list_all_animes()
+    cache = StatCache(os.path.join(anime_lib.root_dir, CACHE_FILENAME))
+    paths = anime_lib.list_all_episode_paths()
+
+    # Fingerprint every episode, not just same-size candidates, so files/sec measures hashing
+    # rather than stat calls. The warm run should be served from the cache.
+    benchmark_cold_warm(
+        "Fingerprint", cache, len(paths), lambda: fingerprint_files(paths, cache)
+    )
+
+    groups = find_library_duplicates(anime_lib, cache)
+
+    for group in groups:
+        print("[Fingerprint] Duplicates:")
+        for path in group:
+            print(f"    {path}")
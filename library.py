@@ -1,16 +1,27 @@
 import json
 import os
 import re
+from bisect import bisect_left
+from collections.abc import Sequence
 from typing import TypedDict
 
-from natsort import natsorted
+from natsort import natsort_keygen, natsorted
 
+from library_model import LibraryModel, Series
 
-def write_json(file_path: str, data: dict) -> None:
-    """Write a dictionary to a JSON file. Create file if it doesn't exist."""
+NATSORT_KEY = natsort_keygen()
+
+
+def write_json(file_path: str, data: dict, indent: int | None = 4) -> None:
+    """
+    Write a dictionary to a JSON file. Create file if it doesn't exist.
+    Writes to a temp file and swaps it in, so readers never see a half-written file.
+    """
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
 
 
 def read_json(file_path: str) -> dict:
@@ -42,6 +53,9 @@ class AnimeLibrary:
         self.json_file = os.path.join(self.root_dir, "anime_data.json")
         self.anime_data: dict[str, dict] = read_json(self.json_file)
 
+        # Compact in-memory view of all series and episodes, filled by list_all_animes
+        self.model = LibraryModel()
+
     def save_anime_data(self) -> None:
         """Save current anime data to JSON file."""
         write_json(self.json_file, self.anime_data)
@@ -136,7 +150,7 @@ class AnimeLibrary:
 
     def scan(self) -> None:
         """
-        Scan all anime directories, populate self.anime_data,
+        Scan all anime directories, populate self.anime_data and self.model,
         and save to JSON automatically.
         """
         anime_dirs = self.get_anime_directories()
@@ -166,19 +180,54 @@ class AnimeLibrary:
     ) -> str | None:
         """
         Return the full path of an episode using natural sort.
-        Returns None if episode_number is out of range.
+        Returns None if the folder isn't a library series or episode_number is out of range.
         """
-        if not os.path.isdir(anime_folder_path):
+        series = self.series_for_path(anime_folder_path)
+        if series is None:
             return None
+        series = self.refresh_series(series)
+        if 1 <= episode_number <= len(series):
+            return series.episode_path(episode_number - 1)
+        return None
 
-        files = self._split_files_and_dirs(
-            os.listdir(anime_folder_path), anime_folder_path
-        )["files"]
-        sorted_files = natsorted(files)
-        if 1 <= episode_number <= len(sorted_files):
-            return os.path.join(anime_folder_path, sorted_files[episode_number - 1])
+    def series_for_path(self, anime_folder_path: str) -> Series | None:
+        """Return the library series stored at a folder path, if any."""
+        folder_path = os.path.abspath(anime_folder_path)
+        for series in self.model:
+            if series.path == folder_path:
+                return series
         return None
 
+    @staticmethod
+    def _folder_mtime(anime_folder_path: str) -> int:
+        try:
+            return os.stat(anime_folder_path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _add_series(self, model: LibraryModel, anime_name: str, anime_folder_path: str) -> Series:
+        """List a series folder and add (or replace) it in model."""
+        # Stat before listing, so a change made mid-listing is picked up next refresh
+        mtime_ns = self._folder_mtime(anime_folder_path)
+        return model.add_series(
+            anime_name,
+            anime_folder_path,
+            self.list_episode_files(anime_folder_path),
+            mtime_ns,
+        )
+
+    def refresh_series(self, series: Series) -> Series:
+        """
+        Return the current record for a series, re-listing its folder first if the
+        folder changed (episodes added, removed or renamed) since it was last listed.
+        """
+        current = self.model.get(series.name)
+        if current is None or current.path != series.path:
+            return series  # no longer part of the current model
+        if self._folder_mtime(current.path) == current.mtime_ns:
+            return current
+        return self._add_series(self.model, current.name, current.path)
+
     def list_all_animes(self) -> list[tuple[str, str]]:
         """
         Return a list of all anime names and their folder paths.
@@ -188,19 +237,23 @@ class AnimeLibrary:
             {}
         )  # Forces scan. Remove this line to revert to original functionality.
 
-        anime_list = []
+        # Build a fresh model and swap it in: Series records handed out earlier
+        # (selection, grid cards, shelf) keep pointing at the model they came from
+        model = LibraryModel()
         if self.anime_data:
             for name, info in self.anime_data.items():
-                anime_list.append((name, info.get("path", "")))
+                path = info.get("path", "")
+                self._add_series(model, name, path)
         else:
             dirs = self.get_anime_directories()
             for folder in dirs:
                 path = os.path.join(self.root_dir, folder)
                 name = self.get_anime_name(path)
-                anime_list.append((name, path))
+                self._add_series(model, name, path)
                 self.anime_data[name] = {"path": path}
             self.save_anime_data()
-        return anime_list
+        self.model = model
+        return [(series.name, series.path) for series in self.model]
 
     def list_episode_files(self, anime_folder_path: str) -> list[str]:
         """Return a naturally sorted list of episode files for a given anime folder."""
@@ -211,13 +264,35 @@ class AnimeLibrary:
         )["files"]
         return natsorted(files)
 
+    def list_all_episode_paths(self) -> list[str]:
+        """
+        Return the full path of every episode in the current model. Only reads the model,
+        so it is safe off the Tk thread; call list_all_animes first to fill it.
+        """
+        return list(self.model.episode_paths())
+
+    @staticmethod
+    def find_episode_index(episodes: Sequence[str], episode_file: str) -> int | None:
+        """
+        Return the index of episode_file in a naturally sorted episode list.
+        If the file is gone (renamed, replaced by a re-release), return the next
+        episode in natural order instead, or None if it sorted after the last one.
+        """
+        if episode_file in episodes:
+            return episodes.index(episode_file)
+        keys = [NATSORT_KEY(ep) for ep in episodes]
+        index = bisect_left(keys, NATSORT_KEY(episode_file))
+        return index if index < len(episodes) else None
+
     def count_episodes(self, anime_folder_path: str) -> int:
-        """Return the number of episodes in an anime folder."""
-        return len(self.list_episode_files(anime_folder_path))
+        """Return the number of episodes in a library anime folder."""
+        series = self.series_for_path(anime_folder_path)
+        return len(self.refresh_series(series)) if series is not None else 0
 
     def add_or_update_anime(self, anime_name: str, anime_folder_path: str) -> None:
-        """Add a new anime to the internal data or update existing entry."""
+        """Add a new anime to the internal data and the model, or update the existing entry."""
         self.anime_data[anime_name] = {"path": anime_folder_path}
+        self._add_series(self.model, anime_name, anime_folder_path)
         self.save_anime_data()
 
 
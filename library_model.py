@@ -0,0 +1,145 @@
+# library_model.py
+import os
+import tracemalloc
+from array import array
+from collections.abc import Iterator, Sequence
+from itertools import accumulate
+
+
+class Series(Sequence):
+    """
+    One anime series. Behaves as a read-only sequence of episode filenames in
+    natural order, but stores them as a single string plus an array of offsets
+    instead of one str object per episode.
+    """
+
+    __slots__ = ("name", "mtime_ns", "_model", "_prefix_id", "_folder", "_names", "_offsets")
+
+    def __init__(
+        self,
+        model: "LibraryModel",
+        name: str,
+        folder_path: str,
+        episode_files: list[str],
+        mtime_ns: int = 0,
+    ):
+        self.name = name
+        self.mtime_ns = mtime_ns  # folder mtime when episode_files was listed
+        self._model = model
+        prefix, self._folder = os.path.split(folder_path)
+        self._prefix_id = model._intern_prefix(prefix)
+
+        self._names = "".join(episode_files)
+        self._offsets = array("I", [0, *accumulate(map(len, episode_files))])
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self._model.prefixes[self._prefix_id], self._folder)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("episode index out of range")
+        return self._names[self._offsets[index] : self._offsets[index + 1]]
+
+    def episode_path(self, index: int) -> str:
+        return os.path.join(self.path, self[index])
+
+    def episode_paths(self, start: int = 0) -> list[str]:
+        """Full paths of the episodes from start onward, built on demand."""
+        path = self.path
+        return [os.path.join(path, self[i]) for i in range(start, len(self))]
+
+    def __repr__(self) -> str:
+        return f"Series({self.name!r}, {len(self)} episodes)"
+
+
+class LibraryModel:
+    """
+    Compact in-memory view of the whole library: series records keyed by name,
+    with parent directories interned once and shared by every series under them.
+    Prefixes are append-only, since Series records index into them; to rebuild
+    the library, build a new model instead of emptying this one.
+    """
+
+    __slots__ = ("prefixes", "_prefix_ids", "_series")
+
+    def __init__(self) -> None:
+        self.prefixes: list[str] = []
+        self._prefix_ids: dict[str, int] = {}
+        self._series: dict[str, Series] = {}
+
+    def _intern_prefix(self, prefix: str) -> int:
+        prefix_id = self._prefix_ids.get(prefix)
+        if prefix_id is None:
+            prefix_id = len(self.prefixes)
+            self.prefixes.append(prefix)
+            self._prefix_ids[prefix] = prefix_id
+        return prefix_id
+
+    def add_series(
+        self, name: str, folder_path: str, episode_files: list[str], mtime_ns: int = 0
+    ) -> Series:
+        """Add or replace a series. episode_files must already be naturally sorted."""
+        series = Series(self, name, folder_path, episode_files, mtime_ns)
+        self._series[name] = series
+        return series
+
+    def get(self, name: str) -> Series | None:
+        return self._series.get(name)
+
+    def __iter__(self) -> Iterator[Series]:
+        return iter(self._series.values())
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def episode_count(self) -> int:
+        return sum(len(series) for series in self._series.values())
+
+    def episode_paths(self) -> Iterator[str]:
+        """Yield the full path of every episode in the library."""
+        for series in self._series.values():
+            yield from series.episode_paths()
+
+
+if __name__ == "__main__":
+    # Compare memory footprint for a synthetic 100k-episode library
+    ROOT = "/home/moondip/Videos"
+    SERIES_COUNT = 4_000
+    EPISODES_PER_SERIES = 25
+
+    def synthetic_library():
+        for s in range(SERIES_COUNT):
+            name = f"Some Fairly Long Anime Title {s:04d}"
+            folder = os.path.join(ROOT, f"[SubGroup] {name} (1080p)")
+            episodes = [f"[SubGroup] {name} - {e:02d} [1080p][ABCD1234].mkv" for e in range(1, EPISODES_PER_SERIES + 1)]
+            yield name, folder, episodes
+
+    # Before: plain dicts of full absolute path strings
+    tracemalloc.start()
+    before = {}
+    for name, folder, episodes in synthetic_library():
+        before[name] = {"path": folder, "episodes": [os.path.join(folder, ep) for ep in episodes]}
+    before_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del before
+
+    # After: compact model
+    tracemalloc.start()
+    model = LibraryModel()
+    for name, folder, episodes in synthetic_library():
+        model.add_series(name, folder, episodes)
+    after_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = model.episode_count()
+    print(f"[Bench] {len(model)} series, {total} episodes")
+    print(f"[Bench] dicts of path strings: {before_bytes / 2**20:.1f} MiB ({before_bytes / total:.0f} B/episode)")
+    print(f"[Bench] compact model:         {after_bytes / 2**20:.1f} MiB ({after_bytes / total:.0f} B/episode)")
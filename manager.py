@@ -1,42 +1,127 @@
 import os
+import threading
 from library import AnimeLibrary
+from library_model import Series
+from metadata import CACHE_FILENAME as METADATA_FILENAME
+from metadata import probe_files, probe_library
 from player import CelluloidPlayer
-from watch_data import load_watch_data, save_watch_data
+from stat_cache import StatCache
+from watch_data import WatchHistory
+
+SHELF_SIZE = 8  # series shown in the "Continue Watching" shelf
 
 
 class AnimeManager:
     def __init__(self, anime_dir: str):
         self.library = AnimeLibrary(anime_dir)
-        self.anime_list = self.library.list_all_animes()
+        self.library.list_all_animes()
         self.player = CelluloidPlayer()
+        self.metadata = StatCache(
+            os.path.join(self.library.root_dir, METADATA_FILENAME)
+        )
+
+        self.warm_up_metadata()
+
+        self.history = WatchHistory.load()
 
-        self.current_anime_name: str | None = None
-        self.current_anime_path: str | None = None
-        self.current_episodes: list[str] = []
+        self.current_series: Series | None = None
+
+    @property
+    def model(self):
+        """The library's current model; list_all_animes replaces it rather than mutating it."""
+        return self.library.model
 
     # ------------------- Selection ------------------- #
-    def select_anime(self, anime_name: str, anime_path: str):
-        self.current_anime_name = anime_name
-        self.current_anime_path = anime_path
-        self.current_episodes = self.library.list_episode_files(anime_path)
+    def select_anime(self, series: Series):
+        # One stat of the folder; re-lists only if episodes were added/removed since startup
+        self.current_series = self.library.refresh_series(series)
+
+    @property
+    def current_anime_name(self) -> str | None:
+        return self.current_series.name if self.current_series else None
+
+    @property
+    def current_episodes(self) -> Series | tuple:
+        """Episode filenames of the selected series, read straight from the library model."""
+        return self.current_series if self.current_series is not None else ()
+
+    # ------------------- Metadata ------------------- #
+    def episode_durations(self, series: Series, start: int = 0) -> list[float | None]:
+        """
+        Durations (seconds) of a series' episodes from start onward, probed once and cached on disk.
+        Reads files, so the UI calls it off the Tk thread.
+        """
+        paths = series.episode_paths(start)
+        results = probe_files(paths, self.metadata)
+        self.metadata.save()
+        return [results[p]["duration"] if p in results else None for p in paths]
+
+    def time_left(self, series: Series, from_index: int = 0) -> float:
+        """Total runtime in seconds of a series from from_index onward."""
+        return sum(d or 0 for d in self.episode_durations(series, from_index))
+
+    def warm_up_metadata(self):
+        """Probe the whole library in the background so durations are ready before they're asked for."""
+        threading.Thread(
+            target=probe_library,
+            args=(self.library, self.metadata),
+            name="metadata-warm-up",
+            daemon=True,
+        ).start()
 
     # ------------------- Playback ------------------- #
     def play_from_index(self, start_index: int):
-        if not self.current_anime_path or not self.current_episodes:
+        if not self.current_series:
             return
-        playlist = [os.path.join(self.current_anime_path, ep) for ep in self.current_episodes]
-        self.player.play_playlist(self.current_anime_name, playlist, start_index=start_index)
+        # Only the paths that will actually be played are built
+        playlist = self.current_series.episode_paths(start_index)
+        self.player.play_playlist(self.current_series.name, playlist)
 
-    def resume_last_watched(self):
-        if not self.current_anime_name:
+    def next_episode_index(self, series: Series | None = None) -> int | None:
+        """
+        Index of the episode to resume in a series (default: the selected one),
+        without starting playback. None if it was never watched or the episode is gone
+        and nothing sorts after it.
+        """
+        series = series if series is not None else self.current_series
+        if series is None:
             return None
-        result = load_watch_data(self.current_anime_name)
-        if not result:
+        entry = self.history.get(series.name)
+        if not entry:
             return None
-        episode_path, _ = result
-        episode_file = os.path.basename(episode_path)
-        if episode_file not in self.current_episodes:
+
+        # The episode the last session was on, or the one after it if the file is gone
+        return self.library.find_episode_index(series, os.path.basename(entry["episode"]))
+
+    def resume_last_watched(self):
+        index = self.next_episode_index()
+        if index is None:
             return None
-        index = self.current_episodes.index(episode_file)
         self.play_from_index(index)
-        return episode_file, index
+        return self.current_episodes[index], index
+
+    # ------------------- Watch history ------------------- #
+    def handle_player_event(self, event) -> bool:
+        """Record progress from a player event. Returns True if watch history changed."""
+        if event.kind not in ("stopped", "exited") or not event.anime_name:
+            return False
+        self.history.record(event.anime_name, event.episode, 0, event.timestamp)
+        return True
+
+    def continue_watching(self, limit: int = SHELF_SIZE) -> list[tuple[Series, int]]:
+        """
+        Return (series, resume_index) for the most recently watched series.
+        Series that are no longer in the library are left out.
+        """
+        shelf: list[tuple[Series, int]] = []
+
+        def accept(anime_name: str, entry: dict) -> bool:
+            series = self.model.get(anime_name)
+            index = self.next_episode_index(series) if series is not None else None
+            if index is None:
+                return False
+            shelf.append((series, index))
+            return True
+
+        self.history.recent(limit, accept)
+        return shelf
@@ -0,0 +1,234 @@
+# metadata.py
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import BinaryIO, TypedDict
+
+from library import AnimeLibrary
+from stat_cache import StatCache, benchmark_cold_warm, cached_map
+
+# ---------------- CONFIG ----------------
+CACHE_FILENAME = "metadata.json"  # stored next to anime_data.json
+MAX_WORKERS = min(32, (os.cpu_count() or 4) * 4)  # header reads are I/O bound
+MAX_ELEMENTS = 64  # top-level elements/boxes to walk before giving up
+MAX_INFO_SIZE = 64 * 1024  # sanity cap on the Segment Info payload
+SAVE_EVERY = 500  # files probed between index saves during a full library probe
+
+# ---------------- MATROSKA IDS ----------------
+EBML_HEADER = 0x1A45DFA3
+SEGMENT = 0x18538067
+SEGMENT_INFO = 0x1549A966
+CLUSTER = 0x1F43B675
+TIMESTAMP_SCALE = 0x2AD7B1
+DURATION = 0x4489
+
+
+class EpisodeMetadata(TypedDict):
+    container: str | None
+    duration: float | None  # seconds
+
+
+# ---------------- MATROSKA ----------------
+def _read_vint(f: BinaryIO, keep_marker: bool) -> tuple[int | None, int]:
+    """
+    Read an EBML variable-length integer. Returns (value, length);
+    value is None for the reserved "unknown size" encoding.
+    """
+    first = f.read(1)
+    if not first:
+        raise EOFError
+    b = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not b & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ValueError("Invalid EBML vint")
+
+    rest = f.read(length - 1)
+    if len(rest) != length - 1:
+        raise EOFError
+    value = b if keep_marker else b & (mask - 1)
+    for byte in rest:
+        value = (value << 8) | byte
+
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return None, length
+    return value, length
+
+
+def _read_element_header(f: BinaryIO) -> tuple[int, int | None]:
+    element_id, _ = _read_vint(f, keep_marker=True)
+    size, _ = _read_vint(f, keep_marker=False)
+    return element_id, size
+
+
+def _parse_segment_info(data: bytes) -> float | None:
+    """Return the duration in seconds from a Segment Info payload."""
+    scale = 1_000_000  # default TimestampScale: 1 ms
+    duration = None
+    buf = BytesIO(data)
+
+    while buf.tell() < len(data):
+        element_id, size = _read_element_header(buf)
+        if size is None:
+            break
+        payload = buf.read(size)
+
+        if element_id == TIMESTAMP_SCALE:
+            scale = int.from_bytes(payload, "big")
+        elif element_id == DURATION and size in (4, 8):
+            duration = struct.unpack(">f" if size == 4 else ">d", payload)[0]
+
+    if duration is None:
+        return None
+    return duration * scale / 1e9
+
+
+def probe_matroska(f: BinaryIO) -> float | None:
+    """Walk EBML header -> Segment -> Info and return the duration in seconds."""
+    element_id, size = _read_element_header(f)
+    if element_id != EBML_HEADER or size is None:
+        return None
+    f.seek(size, os.SEEK_CUR)
+
+    element_id, _ = _read_element_header(f)
+    if element_id != SEGMENT:
+        return None
+
+    for _ in range(MAX_ELEMENTS):
+        element_id, size = _read_element_header(f)
+        if element_id == SEGMENT_INFO and size is not None and size <= MAX_INFO_SIZE:
+            return _parse_segment_info(f.read(size))
+        if element_id == CLUSTER or size is None:
+            return None  # Info always precedes the first Cluster
+        f.seek(size, os.SEEK_CUR)
+    return None
+
+
+# ---------------- MP4 ----------------
+def _iter_boxes(f: BinaryIO, end: int):
+    """Yield (type, payload_start, payload_end) for boxes between the current position and end."""
+    for _ in range(MAX_ELEMENTS):
+        start = f.tell()
+        if start + 8 > end:
+            return
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        header_len = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_len = 16
+        elif size == 0:
+            size = end - start
+        if size < header_len:
+            return
+
+        yield box_type, start + header_len, start + size
+        f.seek(start + size)
+
+
+def probe_mp4(f: BinaryIO, file_size: int) -> float | None:
+    """Find moov/mvhd (wherever moov sits in the file) and return the duration in seconds."""
+    for box_type, start, end in _iter_boxes(f, file_size):
+        if box_type != b"moov":
+            continue
+        f.seek(start)
+        for child_type, child_start, _ in _iter_boxes(f, end):
+            if child_type != b"mvhd":
+                continue
+            f.seek(child_start)
+            version = f.read(4)[0]
+            if version == 1:
+                _, _, timescale, duration = struct.unpack(">QQIQ", f.read(28))
+                unknown = 0xFFFFFFFFFFFFFFFF
+            else:
+                _, _, timescale, duration = struct.unpack(">IIII", f.read(16))
+                unknown = 0xFFFFFFFF
+            if not timescale or duration == unknown:
+                return None
+            return duration / timescale
+        return None
+    return None
+
+
+# ---------------- PROBING ----------------
+def probe_file(path: str) -> EpisodeMetadata:
+    """Read only the container headers of a video file and return its metadata."""
+    with open(path, "rb") as f:
+        magic = f.read(12)
+        f.seek(0)
+        try:
+            if magic[:4] == EBML_HEADER.to_bytes(4, "big"):
+                return {"container": "matroska", "duration": probe_matroska(f)}
+            if magic[4:8] == b"ftyp":
+                size = os.fstat(f.fileno()).st_size
+                return {"container": "mp4", "duration": probe_mp4(f, size)}
+        except (EOFError, ValueError, IndexError, struct.error):
+            pass
+    return {"container": None, "duration": None}
+
+
+def _probe_job(path: str) -> tuple[str, EpisodeMetadata | None]:
+    try:
+        return path, probe_file(path)
+    except OSError:
+        return path, None
+
+
+def probe_files(
+    paths: list[str], cache: StatCache, max_workers: int = MAX_WORKERS
+) -> dict[str, EpisodeMetadata]:
+    """Probe container headers in a thread pool (the reads are I/O bound); maps path -> EpisodeMetadata."""
+    return cached_map(paths, cache, _probe_job, ThreadPoolExecutor, max_workers)
+
+
+def probe_library(
+    library: AnimeLibrary,
+    cache: StatCache | None = None,
+    max_workers: int = MAX_WORKERS,
+) -> StatCache:
+    """
+    Probe every episode in the library and persist the index next to the library data.
+    The index is saved every SAVE_EVERY files, so an interrupted first probe keeps its progress.
+    Entries for files no longer in the library are pruned.
+    """
+    if cache is None:
+        cache = StatCache(os.path.join(library.root_dir, CACHE_FILENAME))
+    paths = library.list_all_episode_paths()
+
+    for i in range(0, len(paths), SAVE_EVERY):
+        probe_files(paths[i : i + SAVE_EVERY], cache, max_workers)
+        cache.save()
+
+    cache.prune(paths)
+    cache.save()
+    return cache
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as e.g. '4h 05m' or '23m'."""
+    minutes = int(seconds // 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+
+
+if __name__ == "__main__":
+    VIDEOS_DIR = "/home/moondip/Videos"
+    anime_lib = AnimeLibrary(VIDEOS_DIR)
+    anime_lib.list_all_animes()
+    cache = StatCache(os.path.join(anime_lib.root_dir, CACHE_FILENAME))
+    paths = anime_lib.list_all_episode_paths()
+
+    # Cold run reads every header; the warm run should be served from the index
+    results = benchmark_cold_warm(
+        "Metadata", cache, len(paths), lambda: probe_files(paths, cache)
+    )
+    cache.save()
+
+    total = sum(meta["duration"] or 0 for meta in results.values())
+    print(f"[Metadata] Total runtime: {format_duration(total)}")
@@ -1,71 +1,224 @@
 # player.py
 import os
+import queue
 import signal
 import subprocess
+import sys
+import tempfile
 import threading
+import time
+from typing import Callable, NamedTuple
 
 from watch_data import save_watch_data
 
+POLL_INTERVAL = 0.2  # seconds between checks on the running process
+STOP_TIMEOUT = 2  # seconds to wait after SIGTERM before SIGKILL
 
-class CelluloidPlayer:
-    def __init__(self):
+
+class PlayerEvent(NamedTuple):
+    kind: str  # "started", "stopped", "exited" or "error"
+    anime_name: str | None
+    episode: str | None
+    timestamp: float
+
+
+class _Session:
+    """One playlist run. Only ever touched by the worker thread."""
+
+    def __init__(self, anime_name: str, playlist: list[str], start_index: int):
+        self.anime_name = anime_name
+        self.playlist = playlist
+        self.start_index = start_index
         self.process: subprocess.Popen | None = None
-        self.current_playlist: list[str] = []
-        self.current_episode_index: int = 0
-        self.current_anime: str | None = None
-        self.is_playing = False
-        self._monitor_thread: threading.Thread | None = None
+        self.ended = False
+
+    @property
+    def episode(self) -> str:
+        return self.playlist[self.start_index]
+
+
+class CelluloidPlayer:
+    """
+    Controls Celluloid from a dedicated worker thread. play_playlist/stop only
+    enqueue a command and return immediately, so they're safe to call from the
+    Tk main thread. Results come back on self.events, which the UI drains.
+    """
+
+    def __init__(
+        self,
+        command: list[str] | None = None,
+        save_progress: Callable[[str, str, int], None] = save_watch_data,
+    ):
+        self.command = command or ["celluloid"]
+        self.save_progress = save_progress
+        self.events: queue.Queue[PlayerEvent] = queue.Queue()
 
+        self._commands: queue.Queue[tuple] = queue.Queue()
+        self._lock = threading.Lock()
+        self._is_playing = False
+        self._session: _Session | None = None
+
+        self._worker = threading.Thread(
+            target=self._run, name="celluloid-player", daemon=True
+        )
+        self._worker.start()
+
+    @property
+    def is_playing(self) -> bool:
+        with self._lock:
+            return self._is_playing
+
+    # ------------------- UI thread API ------------------- #
     def play_playlist(self, anime_name: str, episodes: list[str], start_index: int = 0):
         """Play episodes from start_index till the end in fullscreen CLI Celluloid"""
-        self.stop()  # stop previous playback
+        self._commands.put(("play", anime_name, list(episodes), start_index))
+
+    def stop(self):
+        self._commands.put(("stop",))
+
+    def shutdown(self, timeout: float | None = None):
+        """Stop playback and wait for the worker to save progress and exit."""
+        self._commands.put(("shutdown",))
+        self._worker.join(timeout)
+
+    # ------------------- Worker thread ------------------- #
+    def _run(self):
+        while True:
+            try:
+                command = self._commands.get(
+                    timeout=POLL_INTERVAL if self._session else None
+                )
+            except queue.Empty:
+                if self._session and self._session.process.poll() is not None:
+                    self._end_session("exited")
+                continue
 
+            kind = command[0]
+            if kind == "play":
+                self._end_session("stopped")
+                self._start(*command[1:])
+            elif kind == "stop":
+                self._end_session("stopped")
+            elif kind == "shutdown":
+                self._end_session("stopped")
+                return
+
+    def _emit(self, kind: str, anime_name: str | None = None, episode: str | None = None):
+        self.events.put(PlayerEvent(kind, anime_name, episode, time.time()))
+
+    def _start(self, anime_name: str, episodes: list[str], start_index: int):
         if not episodes:
             print("[WARN] No episodes to play")
             return
 
         # Only existing files
-        episodes = [ep for ep in episodes if os.path.exists(ep)]
-        if not episodes:
+        existing = [ep for ep in episodes if os.path.exists(ep)]
+        if not existing:
             print("[ERROR] None of the episodes exist")
+            self._emit("error", anime_name)
             return
+        if len(existing) != len(episodes):
+            # Keep start_index pointing at the same episode after filtering
+            start_index = sum(1 for ep in episodes[:start_index] if ep in existing)
+        start_index = min(start_index, len(existing) - 1)
 
-        self.current_playlist = episodes
-        self.current_episode_index = start_index
-        self.current_anime = anime_name
-        self.is_playing = True
-
-        playlist_to_play = episodes[start_index:]
-        cmd = ["celluloid"] + playlist_to_play
+        session = _Session(anime_name, existing, start_index)
+        playlist_to_play = existing[start_index:]
         print(
             f"[Celluloid] Playing {anime_name} playlist fullscreen: {playlist_to_play}"
         )
-        self.process = subprocess.Popen(cmd)
+        try:
+            session.process = subprocess.Popen(self.command + playlist_to_play)
+        except OSError as e:
+            print(f"[ERROR] Failed to start {self.command[0]}: {e}")
+            self._emit("error", anime_name, session.episode)
+            return
 
-        self._monitor_thread = threading.Thread(
-            target=self._monitor_process, daemon=True
-        )
-        self._monitor_thread.start()
+        self._session = session
+        with self._lock:
+            self._is_playing = True
+        self._emit("started", anime_name, session.episode)
 
-    def _monitor_process(self):
-        if self.process:
-            self.process.wait()
-            self.is_playing = False
-            if self.current_anime and self.current_playlist:
-                last_episode = self.current_playlist[self.current_episode_index]
-                save_watch_data(self.current_anime, last_episode, 0)
-                print(f"[Celluloid] Finished playlist starting from {last_episode}")
+    def _terminate(self, process: subprocess.Popen):
+        try:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=STOP_TIMEOUT)
+        except Exception:
+            process.kill()
+            process.wait()
 
-    def stop(self):
-        if self.process:
-            try:
-                self.process.send_signal(signal.SIGTERM)
-                self.process.wait(timeout=2)
-            except Exception:
-                self.process.kill()
-            self.process = None
-            self.is_playing = False
-            if self.current_anime and self.current_playlist:
-                last_episode = self.current_playlist[self.current_episode_index]
-                save_watch_data(self.current_anime, last_episode, 0)
-                print(f"[Celluloid] Stopped playlist at {last_episode}")
+    def _end_session(self, kind: str):
+        """Tear down the current session and record progress exactly once."""
+        session = self._session
+        if session is None or session.ended:
+            return
+        session.ended = True
+        self._session = None
+
+        if kind == "stopped" and session.process.poll() is None:
+            self._terminate(session.process)
+        with self._lock:
+            self._is_playing = False
+
+        # Celluloid exits the same way whether the playlist ran out or its window was
+        # closed, so an exit says nothing about how far playback got: record it like a stop.
+        try:
+            self.save_progress(session.anime_name, session.episode, 0)
+        except Exception as e:
+            print(f"[ERROR] Failed to save watch data: {e}")
+        verb = "Player exited at" if kind == "exited" else "Stopped playlist at"
+        print(f"[Celluloid] {verb} {session.episode}")
+        self._emit(kind, session.anime_name, session.episode)
+
+
+if __name__ == "__main__":
+    # Measure how long the UI thread is blocked while stopping and switching playback.
+    # The fake player ignores SIGTERM, which is the worst case for the old blocking stop().
+    fake_player = [
+        sys.executable,
+        "-c",
+        "import signal, sys, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(60)",
+    ]
+    tmp_dir = tempfile.mkdtemp()
+    episodes = []
+    for i in range(3):
+        path = os.path.join(tmp_dir, f"ep{i + 1}.mkv")
+        open(path, "wb").close()
+        episodes.append(path)
+
+    saves = []
+    player = CelluloidPlayer(fake_player, save_progress=lambda *args: saves.append(args))
+
+    def ui_loop(action, seconds=3.0, tick=0.01):
+        """Simulate a Tk loop: run action on the first tick, return (call latency, max tick gap)."""
+        start = last = time.perf_counter()
+        call_latency = max_gap = 0.0
+        while time.perf_counter() - start < seconds:
+            if action:
+                t0 = time.perf_counter()
+                action()
+                call_latency = time.perf_counter() - t0
+                action = None
+            while not player.events.empty():
+                player.events.get_nowait()
+            time.sleep(tick)
+            now = time.perf_counter()
+            max_gap = max(max_gap, now - last)
+            last = now
+        return call_latency, max_gap
+
+    process = subprocess.Popen(fake_player)
+    time.sleep(0.2)
+    latency, gap = ui_loop(lambda: player._terminate(process))
+    print(f"[Bench] blocking stop on UI thread (old): call returned in {latency * 1000:.2f} ms, max UI tick gap {gap * 1000:.1f} ms")
+
+    ui_loop(lambda: player.play_playlist("Bench", episodes, 0), seconds=0.5)
+    for label, action in (
+        ("switch", lambda: player.play_playlist("Bench", episodes, 1)),
+        ("stop", player.stop),
+    ):
+        latency, gap = ui_loop(action)
+        print(f"[Bench] {label}: call returned in {latency * 1000:.2f} ms, max UI tick gap {gap * 1000:.1f} ms")
+
+    player.shutdown()
+    print(f"[Bench] progress writes: {len(saves)} (expected 2)")
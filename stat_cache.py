@@ -0,0 +1,128 @@
+# stat_cache.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable
+
+from library import read_json, write_json
+
+
+def stat_key(path: str) -> list[int] | None:
+    """Return the (inode, size, mtime_ns) signature of a file, or None if it can't be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+class StatCache:
+    """
+    A persisted path -> value cache that is invalidated whenever a file's
+    (inode, size, mtime) signature changes, so unchanged files are never re-read.
+    """
+
+    def __init__(self, json_file: str) -> None:
+        self.json_file = json_file
+        try:
+            self.entries: dict[str, dict] = read_json(json_file)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # A cache can always be rebuilt, so a broken one just starts over
+            print(f"[WARN] Ignoring unreadable cache {json_file}")
+            self.entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def get(self, path: str, key: list[int] | None = None):
+        """Return the cached value for path if its signature still matches, else None."""
+        key = key if key is not None else stat_key(path)
+        if key is None:
+            return None
+        with self._lock:
+            entry = self.entries.get(path)
+        if entry and entry.get("key") == key:
+            return entry.get("value")
+        return None
+
+    def put(self, path: str, key: list[int], value) -> None:
+        """Store a value for path under the given signature."""
+        with self._lock:
+            self.entries[path] = {"key": key, "value": value}
+            self._dirty = True
+
+    def prune(self, keep_paths) -> None:
+        """Drop entries for paths not in keep_paths (deleted or moved files)."""
+        keep = set(keep_paths)
+        with self._lock:
+            stale = [p for p in self.entries if p not in keep]
+            for p in stale:
+                del self.entries[p]
+            if stale:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache to disk if anything changed since it was loaded."""
+        with self._lock:
+            if not self._dirty:
+                return
+            # Compact: these indexes grow with the library and are rewritten often
+            write_json(self.json_file, self.entries, indent=None)
+            self._dirty = False
+
+
+def cached_map(
+    paths: list[str],
+    cache: StatCache,
+    job: Callable[[str], tuple[str, Any]],
+    executor_cls: type[Executor],
+    max_workers: int,
+    chunksize: int = 1,
+) -> dict[str, Any]:
+    """
+    Run job over paths in an executor, skipping any whose (inode, size, mtime)
+    signature is already cached. job returns (path, value), with value None on failure.
+    """
+    results: dict[str, Any] = {}
+    keys: dict[str, list[int]] = {}
+    pending: list[str] = []
+
+    for path in paths:
+        key = stat_key(path)
+        if key is None:
+            continue
+        cached = cache.get(path, key)
+        if cached is not None:
+            results[path] = cached
+        else:
+            keys[path] = key
+            pending.append(path)
+
+    if max_workers > 1 and len(pending) > 1:
+        with executor_cls(max_workers=max_workers) as pool:
+            computed = list(pool.map(job, pending, chunksize=chunksize))
+    else:
+        computed = [job(path) for path in pending]
+
+    for path, value in computed:
+        if value is not None:
+            cache.put(path, keys[path], value)
+            results[path] = value
+
+    return results
+
+
+def benchmark_cold_warm(tag: str, cache: StatCache, count: int, run: Callable[[], Any]):
+    """
+    Time run() against an emptied cache and again against the filled one,
+    printing files/sec for both. Returns the result of the warm run.
+    """
+    cache.entries.clear()
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed else float("inf")
+        print(f"[{tag}] {label}: {count} files in {elapsed:.2f}s ({rate:.0f} files/sec)")
+    return result
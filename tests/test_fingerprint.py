@@ -0,0 +1,76 @@
+import hashlib
+
+import pytest
+
+import fingerprint
+from fingerprint import BLOCK_SIZE, find_duplicate_groups, fingerprint_file, fingerprint_files
+from stat_cache import StatCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return StatCache(str(tmp_path / "fingerprints.json"))
+
+
+@pytest.fixture
+def job_calls(monkeypatch):
+    """Record every path handed to the fingerprint job (run in-process with max_workers=1)."""
+    calls = []
+    job = fingerprint._fingerprint_job
+
+    def spy(path):
+        calls.append(path)
+        return job(path)
+
+    monkeypatch.setattr(fingerprint, "_fingerprint_job", spy)
+    return calls
+
+
+def write(path, data: bytes) -> str:
+    path.write_bytes(data)
+    return str(path)
+
+
+# ---------------- DUPLICATES ----------------
+def test_unique_sizes_are_never_read(tmp_path, cache, job_calls):
+    unique = write(tmp_path / "unique.mkv", b"a" * 10)
+    first = write(tmp_path / "first.mkv", b"b" * 20)
+    copy = write(tmp_path / "copy.mkv", b"b" * 20)
+    other = write(tmp_path / "other.mkv", b"c" * 20)
+
+    groups = find_duplicate_groups([unique, first, copy, other], cache, max_workers=1)
+
+    assert groups == [sorted([first, copy])]
+    assert unique not in job_calls
+    assert sorted(job_calls) == sorted([first, copy, other])
+
+
+# ---------------- BLOCKS ----------------
+def test_large_file_hashes_head_middle_and_tail(tmp_path):
+    size = 4 * BLOCK_SIZE + 100
+    data = bytes(i % 251 for i in range(size))
+    path = write(tmp_path / "ep.mkv", data)
+
+    middle = (size - BLOCK_SIZE) // 2
+    expected = hashlib.blake2b(size.to_bytes(8, "little"), digest_size=16)
+    for offset in (0, middle, size - BLOCK_SIZE):
+        expected.update(data[offset : offset + BLOCK_SIZE])
+    assert fingerprint_file(path) == f"{size}:{expected.hexdigest()}"
+
+    # Bytes between the blocks are not part of the fingerprint
+    gap = bytearray(data)
+    gap[BLOCK_SIZE + 10] ^= 0xFF
+    assert fingerprint_file(write(tmp_path / "gap.mkv", bytes(gap))) == fingerprint_file(path)
+
+
+# ---------------- CACHE ----------------
+def test_warm_cache_skips_the_job(tmp_path, cache, job_calls):
+    paths = [write(tmp_path / f"ep{i}.mkv", bytes([i]) * 100) for i in range(3)]
+
+    cold = fingerprint_files(paths, cache, max_workers=1)
+    assert len(job_calls) == 3
+
+    job_calls.clear()
+    warm = fingerprint_files(paths, cache, max_workers=1)
+    assert job_calls == []
+    assert warm == cold
@@ -0,0 +1,124 @@
+import struct
+from io import BytesIO
+
+import pytest
+
+from metadata import (
+    CLUSTER,
+    DURATION,
+    EBML_HEADER,
+    SEGMENT,
+    SEGMENT_INFO,
+    TIMESTAMP_SCALE,
+    probe_file,
+    probe_matroska,
+    probe_mp4,
+)
+
+
+# ---------------- BUILDERS ----------------
+def ebml_element(element_id: int, payload: bytes, unknown_size: bool = False) -> bytes:
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    if unknown_size:
+        size = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+    else:
+        size = (0x10000000 | len(payload)).to_bytes(4, "big")
+    return id_bytes + size + payload
+
+
+def matroska(info: bytes, unknown_segment_size: bool = False) -> bytes:
+    segment = (
+        ebml_element(0x114D9B74, b"\x00" * 20)  # SeekHead
+        + ebml_element(SEGMENT_INFO, info)
+        + ebml_element(CLUSTER, b"\x00" * 100)
+    )
+    return ebml_element(EBML_HEADER, b"\x42\x86\x81\x01") + ebml_element(
+        SEGMENT, segment, unknown_size=unknown_segment_size
+    )
+
+
+def box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def mvhd(version: int, timescale: int, duration: int) -> bytes:
+    if version == 1:
+        fields = struct.pack(">QQIQ", 0, 0, timescale, duration)
+    else:
+        fields = struct.pack(">IIII", 0, 0, timescale, duration)
+    return box(b"mvhd", bytes([version, 0, 0, 0]) + fields + b"\x00" * 80)
+
+
+def mp4(*boxes: bytes) -> bytes:
+    return box(b"ftyp", b"isom\x00\x00\x00\x00") + b"".join(boxes)
+
+
+# ---------------- MATROSKA ----------------
+def test_matroska_8_byte_duration():
+    info = ebml_element(TIMESTAMP_SCALE, (1_000_000).to_bytes(3, "big")) + ebml_element(
+        DURATION, struct.pack(">d", 1_420_500.0)
+    )
+    assert probe_matroska(BytesIO(matroska(info))) == pytest.approx(1420.5)
+
+
+def test_matroska_4_byte_float_duration_and_default_scale():
+    info = ebml_element(DURATION, struct.pack(">f", 1_440_000.0))
+    assert probe_matroska(BytesIO(matroska(info))) == pytest.approx(1440.0)
+
+
+def test_matroska_unknown_size_segment():
+    info = ebml_element(DURATION, struct.pack(">d", 60_000.0))
+    data = matroska(info, unknown_segment_size=True)
+    assert probe_matroska(BytesIO(data)) == pytest.approx(60.0)
+
+
+def test_matroska_without_duration():
+    info = ebml_element(TIMESTAMP_SCALE, (1_000_000).to_bytes(3, "big"))
+    assert probe_matroska(BytesIO(matroska(info))) is None
+
+
+# ---------------- MP4 ----------------
+def test_mp4_mvhd_version_0():
+    data = mp4(box(b"moov", mvhd(0, 1000, 1_440_000)))
+    assert probe_mp4(BytesIO(data), len(data)) == pytest.approx(1440.0)
+
+
+def test_mp4_mvhd_version_1():
+    data = mp4(box(b"moov", mvhd(1, 90_000, 90_000 * 1500)))
+    assert probe_mp4(BytesIO(data), len(data)) == pytest.approx(1500.0)
+
+
+def test_mp4_moov_after_mdat():
+    data = mp4(box(b"mdat", b"\x00" * 5000), box(b"moov", mvhd(0, 600, 600 * 30)))
+    assert probe_mp4(BytesIO(data), len(data)) == pytest.approx(30.0)
+
+
+# ---------------- FILES ----------------
+def test_probe_file_detects_containers(tmp_path):
+    mkv_path = tmp_path / "ep.mkv"
+    mkv_path.write_bytes(matroska(ebml_element(DURATION, struct.pack(">d", 5_000.0))))
+    mp4_path = tmp_path / "ep.mp4"
+    mp4_path.write_bytes(mp4(box(b"moov", mvhd(0, 1000, 5000))))
+
+    assert probe_file(str(mkv_path)) == {"container": "matroska", "duration": 5.0}
+    assert probe_file(str(mp4_path)) == {"container": "mp4", "duration": 5.0}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        matroska(ebml_element(DURATION, struct.pack(">d", 5_000.0)))[:30],
+        mp4(box(b"moov", mvhd(0, 1000, 5000)))[:40],
+    ],
+    ids=["matroska", "mp4"],
+)
+def test_probe_file_truncated(tmp_path, data):
+    path = tmp_path / "truncated.bin"
+    path.write_bytes(data)
+    assert probe_file(str(path))["duration"] is None
+
+
+def test_probe_file_unknown_format(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"not a video")
+    assert probe_file(str(path)) == {"container": None, "duration": None}
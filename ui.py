@@ -1,13 +1,17 @@
 import io
 import os
+import queue
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 
 import cairosvg
 import customtkinter as ctk
 from PIL import Image, ImageTk
 
-from cover_downloader import CACHE_DIR, download_cover
+from cover_downloader import COVER_STORE, ensure_cover
 from manager import AnimeManager
+from metadata import format_duration
+from player import STOP_TIMEOUT
 
 CARD_WIDTH = 150
 CARD_HEIGHT = 200
@@ -16,6 +20,7 @@ CARD_BG = "#1e1e1e"
 CARD_HOVER_BG = "#2a2a2a"
 CARD_BORDER_COLOR = "#444"
 EPISODE_PANEL_WIDTH = 220  # Reduced by ~25%
+POLL_MS = 100  # how often player events and background results are drained on the Tk thread
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
@@ -52,12 +57,21 @@ class AnimeLibraryUI(ctk.CTk):
         self.title("Anima Lite")
         self.geometry("1200x700")
         self.manager = AnimeManager(anime_dir)
-        self.cover_images = {}
+        self.cover_store = COVER_STORE
+        self.cover_images: dict[str, ImageTk.PhotoImage] = {}  # blob digest -> decoded image
+        self.cover_store.on_evict.append(lambda digest: self.cover_images.pop(digest, None))
+        self.episode_labels: list[ctk.CTkLabel] = []
+
+        # Disk-bound work (metadata probing) runs here; results come back through the poll loop
+        self._background = ThreadPoolExecutor(max_workers=1)
+        self._results: queue.Queue[tuple] = queue.Queue()
 
         self._setup_layout()
+        self.refresh_shelf()
         self.load_anime_grid()
 
         self.bind_all("<KeyPress-q>", lambda e: self.stop_video())
+        self.after(POLL_MS, self._poll_events)
 
     def _setup_layout(self):
         # Left frame
@@ -98,6 +112,18 @@ class AnimeLibraryUI(ctk.CTk):
         )
         self.title_label.pack(side="left")
 
+        # Continue watching shelf (packed only when there's something to show)
+        self.shelf_frame = ctk.CTkFrame(self.left_frame, fg_color="transparent")
+        self.shelf_label = ctk.CTkLabel(
+            self.shelf_frame,
+            text="Continue Watching",
+            font=ctk.CTkFont(size=18, weight="bold"),
+            anchor="w",
+        )
+        self.shelf_label.pack(side="top", fill="x")
+        self.shelf_items = ctk.CTkFrame(self.shelf_frame, fg_color="transparent")
+        self.shelf_items.pack(side="top", fill="x")
+
         # Scrollable canvas for anime grid
         self.canvas_frame = ctk.CTkFrame(self.left_frame, corner_radius=0)
         self.canvas_frame.pack(side="top", fill="both", expand=True)
@@ -171,7 +197,8 @@ class AnimeLibraryUI(ctk.CTk):
         row, col = 0, 0
         skip_downloading_covers = False
 
-        for anime_name, anime_path in self.manager.anime_list:
+        for series in self.manager.model:
+            anime_name = series.name
             card_frame = HoverFrame(
                 self.grid_frame,
                 width=CARD_WIDTH,
@@ -192,31 +219,17 @@ class AnimeLibraryUI(ctk.CTk):
             image_frame.pack_propagate(False)
             image_frame.pack(side="top", fill="both")
 
-            filename = anime_name.replace(" ", "_") + ".jpg"
-            cover_path = os.path.join(CACHE_DIR, filename)
-            if not skip_downloading_covers and not os.path.exists(cover_path):
+            digest = self.cover_store.lookup(anime_name)
+            if not digest and not skip_downloading_covers:
                 try:
-                    result = download_cover(anime_name)
-                    if result:
-                        cover_path = result
+                    digest = ensure_cover(anime_name, self.cover_store)
                 except Exception:
                     skip_downloading_covers = True
-                    cover_path = None
 
-            if cover_path and os.path.exists(cover_path):
-                try:
-                    img = Image.open(cover_path).convert("RGB")
-                    img = img.resize(
-                        (CARD_WIDTH, CARD_HEIGHT), Image.Resampling.LANCZOS
-                    )
-                    photo = ImageTk.PhotoImage(img)
-                    img_label = ctk.CTkLabel(image_frame, image=photo, text="")
-                    img_label.image = photo
-                    self.cover_images[anime_name] = photo
-                except Exception:
-                    img_label = ctk.CTkLabel(
-                        image_frame, text="🖼️", font=("Segoe UI", 48)
-                    )
+            photo = self._cover_photo(digest) if digest else None
+            if photo:
+                img_label = ctk.CTkLabel(image_frame, image=photo, text="")
+                img_label.image = photo
             else:
                 img_label = ctk.CTkLabel(image_frame, text="🖼️", font=("Segoe UI", 48))
 
@@ -240,7 +253,7 @@ class AnimeLibraryUI(ctk.CTk):
                 w.bind("<Leave>", card_frame.on_leave)
                 w.bind(
                     "<Button-1>",
-                    lambda e, n=anime_name, p=anime_path: self.select_anime(n, p),
+                    lambda e, s=series: self.select_anime(s),
                 )
 
             col += 1
@@ -248,13 +261,59 @@ class AnimeLibraryUI(ctk.CTk):
                 col = 0
                 row += 1
 
+        self.cover_store.save()
+
+    def _cover_photo(self, digest: str) -> ImageTk.PhotoImage | None:
+        """Decode a cover blob once and share it between every card that uses it."""
+        if digest in self.cover_images:
+            return self.cover_images[digest]
+        try:
+            img = Image.open(self.cover_store.blob_path(digest)).convert("RGB")
+            if img.size != (CARD_WIDTH, CARD_HEIGHT):
+                img = img.resize((CARD_WIDTH, CARD_HEIGHT), Image.Resampling.LANCZOS)
+        except Exception:
+            return None
+        photo = ImageTk.PhotoImage(img)
+        self.cover_images[digest] = photo
+        return photo
+
+    def refresh_shelf(self):
+        for widget in self.shelf_items.winfo_children():
+            widget.destroy()
+
+        shelf = self.manager.continue_watching()
+        if not shelf:
+            self.shelf_frame.pack_forget()
+            return
+
+        for series, index in shelf:
+            btn = ctk.CTkButton(
+                self.shelf_items,
+                text=f"{series.name}\nEpisode {index + 1}",
+                width=CARD_WIDTH,
+                fg_color=CARD_BG,
+                hover_color=CARD_HOVER_BG,
+                border_width=1,
+                border_color=CARD_BORDER_COLOR,
+                command=lambda s=series, i=index: self.play_from_shelf(s, i),
+            )
+            btn.pack(side="left", padx=5, pady=5)
+
+        if not self.shelf_frame.winfo_ismapped():
+            self.shelf_frame.pack(side="top", fill="x", pady=(0, 10), before=self.canvas_frame)
+
+    def play_from_shelf(self, series, index):
+        self.select_anime(series)
+        self.manager.play_from_index(index)
+
     # Modern episode panel
-    def select_anime(self, anime_name, anime_path):
-        self.manager.select_anime(anime_name, anime_path)
+    def select_anime(self, series):
+        self.manager.select_anime(series)
 
         # Clear previous
         for widget in self.episode_frame.winfo_children():
             widget.destroy()
+        self.episode_labels = []
 
         for index, ep in enumerate(self.manager.current_episodes):
             lbl = ctk.CTkLabel(
@@ -267,39 +326,104 @@ class AnimeLibraryUI(ctk.CTk):
                 corner_radius=5,
             )
             lbl.pack(fill="x", pady=2, padx=2)
+            self.episode_labels.append(lbl)
             lbl.bind("<Enter>", lambda e, l=lbl: l.configure(fg_color="#2a2a2a"))
             lbl.bind("<Leave>", lambda e, l=lbl: l.configure(fg_color="#1e1e1e"))
             lbl.bind(
                 "<Button-1>", lambda e, idx=index: self.manager.play_from_index(idx)
             )
 
-        # Highlight last watched
-        result = self.manager.resume_last_watched()
-        if result:
-            episode_file, _ = result
-            for w in self.episode_frame.winfo_children():
-                if w.cget("text") == episode_file:
-                    w.configure(fg_color="#ff6600")
+        # Highlight the episode to resume
+        start_index = self.manager.next_episode_index()
+        if start_index is not None:
+            self._highlight_episode(start_index)
+        else:
+            start_index = 0
+
+        self._update_time_left(start_index)
+
+    def _update_time_left(self, from_index: int):
+        series = self.manager.current_series
+        if series is None:
+            return
+        self.run_in_background(
+            lambda: self.manager.time_left(series, from_index),
+            lambda seconds: self._show_time_left(series.name, seconds),
+        )
+
+    def _show_time_left(self, anime_name: str, seconds: float):
+        if anime_name != self.manager.current_anime_name:
+            return  # selection changed while probing
+        if seconds:
+            self.episode_label.configure(text=f"Episodes · {format_duration(seconds)} left")
+        else:
+            self.episode_label.configure(text="Episodes")
 
     def resume_last_watched(self):
         result = self.manager.resume_last_watched()
         if result:
-            episode_file, index = result
-            for w in self.episode_frame.winfo_children():
-                if w.cget("text") == episode_file:
-                    w.configure(fg_color="#ff6600")
+            _, index = result
+            self._highlight_episode(index)
+            self._update_time_left(index)
+
+    def _highlight_episode(self, index: int):
+        for i, lbl in enumerate(self.episode_labels):
+            lbl.configure(fg_color="#ff6600" if i == index else "#1e1e1e")
+
+    # ------------------- Player events ------------------- #
+    def run_in_background(self, fn, callback):
+        """Run fn off the Tk thread; callback(result) is then called on the Tk thread."""
+        future = self._background.submit(fn)
+        future.add_done_callback(lambda f: self._results.put((callback, f)))
+
+    def _poll_events(self):
+        """Drain player events and background results; runs on the Tk thread."""
+        while True:
+            try:
+                event = self.manager.player.events.get_nowait()
+            except queue.Empty:
+                break
+            self._on_player_event(event)
+
+        while True:
+            try:
+                callback, future = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[ERROR] Background task failed: {e}")
+                continue
+            callback(result)
+
+        self.after(POLL_MS, self._poll_events)
+
+    def _on_player_event(self, event):
+        if self.manager.handle_player_event(event):
+            self.refresh_shelf()
+        if event.kind != "started" or event.anime_name != self.manager.current_anime_name:
+            return
+        episode_file = os.path.basename(event.episode)
+        if episode_file in self.manager.current_episodes:
+            index = self.manager.current_episodes.index(episode_file)
+            self._highlight_episode(index)
+            self._update_time_left(index)
 
     def stop_video(self):
         self.manager.player.stop()
 
     def on_close(self):
-        self.stop_video()
+        # Hide the window while the player worker saves progress and exits
+        self.withdraw()
+        self._background.shutdown(wait=False, cancel_futures=True)
+        # Bounded: the worker is a daemon thread, so a hung player can't block exit
+        self.manager.player.shutdown(timeout=STOP_TIMEOUT + 1)
         self.destroy()
 
 
 if __name__ == "__main__":
     VIDEOS_DIR = "/home/moondip/Videos"
-    os.makedirs(CACHE_DIR, exist_ok=True)
     app = AnimeLibraryUI(VIDEOS_DIR)
     app.protocol("WM_DELETE_WINDOW", app.on_close)
     app.mainloop()
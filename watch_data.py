@@ -1,36 +1,102 @@
 # watch_data.py
+import heapq
+import itertools
 import json
 import os
+import time
+from typing import Callable
 
 WATCH_FILE = os.path.expanduser("~/.anime_watch_data.json")
 
-def save_watch_data(anime_name: str, episode_file: str, position_ms: int = 0):
+def save_watch_data(anime_name: str, episode_file: str, position_ms: int = 0, updated_at: float | None = None):
     data = {}
     if os.path.exists(WATCH_FILE):
         with open(WATCH_FILE, "r", encoding="utf-8") as f:
             data = json.load(f)
     data[anime_name] = {
         "episode": episode_file,
-        "position_ms": position_ms
+        "position_ms": position_ms,
+        "updated_at": updated_at if updated_at is not None else time.time(),
     }
     os.makedirs(os.path.dirname(WATCH_FILE), exist_ok=True)
     with open(WATCH_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=4, ensure_ascii=False)
 
-def load_watch_data(anime_name: str):
+def load_all_watch_data() -> dict[str, dict]:
     if not os.path.exists(WATCH_FILE) or os.path.getsize(WATCH_FILE) == 0:
-        return None
+        return {}
 
     try:
         with open(WATCH_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            return json.load(f)
     except json.JSONDecodeError:
         # corrupted file — reset
         os.remove(WATCH_FILE)
-        return None
+        return {}
+
+
+class WatchHistory:
+    """
+    In-memory watch progress ordered by recency. Built from the watch file once,
+    then updated per progress event in O(log n) via a heap with lazy deletion:
+    superseded heap items are skipped (and dropped) when read.
+    """
+
+    def __init__(self, data: dict[str, dict] | None = None):
+        self.entries: dict[str, dict] = {}
+        self._heap: list[tuple[float, int, str]] = []  # (-updated_at, seq, anime_name)
+        self._latest: dict[str, int] = {}  # anime_name -> seq of its live heap item
+        self._seq = itertools.count()
+
+        for anime_name, entry in (data or {}).items():
+            self.record(
+                anime_name,
+                entry.get("episode", ""),
+                entry.get("position_ms", 0),
+                entry.get("updated_at", 0.0),  # entries saved before timestamps sort last
+            )
+
+    @classmethod
+    def load(cls) -> "WatchHistory":
+        return cls(load_all_watch_data())
+
+    def record(self, anime_name: str, episode_file: str, position_ms: int = 0, updated_at: float | None = None):
+        updated_at = updated_at if updated_at is not None else time.time()
+        self.entries[anime_name] = {
+            "episode": episode_file,
+            "position_ms": position_ms,
+            "updated_at": updated_at,
+        }
+        seq = next(self._seq)
+        self._latest[anime_name] = seq
+        heapq.heappush(self._heap, (-updated_at, seq, anime_name))
+
+        # Rebuild once stale items outnumber live ones
+        if len(self._heap) > 2 * len(self.entries) + 16:
+            self._heap = [item for item in self._heap if self._latest[item[2]] == item[1]]
+            heapq.heapify(self._heap)
+
+    def get(self, anime_name: str) -> dict | None:
+        return self.entries.get(anime_name)
+
+    def recent(self, limit: int, accept: Callable[[str, dict], bool] | None = None) -> list[tuple[str, dict]]:
+        """
+        Return up to limit (anime_name, entry) pairs, most recently watched first.
+        Entries rejected by accept are skipped without counting towards limit.
+        """
+        result: list[tuple[str, dict]] = []
+        live: list[tuple[float, int, str]] = []
 
-    if anime_name in data:
-        entry = data[anime_name]
-        return entry.get("episode", ""), entry.get("position_ms", 0)
-    return None
+        while self._heap and len(result) < limit:
+            item = heapq.heappop(self._heap)
+            _, seq, anime_name = item
+            if self._latest[anime_name] != seq:
+                continue  # superseded by a newer record
+            live.append(item)
+            entry = self.entries[anime_name]
+            if accept is None or accept(anime_name, entry):
+                result.append((anime_name, entry))
 
+        for item in live:
+            heapq.heappush(self._heap, item)
+        return result